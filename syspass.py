@@ -20,7 +20,7 @@ DOCUMENTATION = """
         python_version: 2.7.9
         syspass_version: > 3.0
         params:
-           -term: the account name (required and must be unique)
+           -term: the account name (required and must be unique), several names can be given at once
              -login: login given to created account
              -category: category given to created account
              -customer: client given to created account
@@ -39,6 +39,7 @@ DOCUMENTATION = """
           - Utility of tokenPass: https://github.com/nuxsmin/sysPass/issues/994#issuecomment-409050974
           - Rudimentary list of API accesses (Deprecated): https://github.com/nuxsmin/sysPass/blob/d0056d74a8a2845fb3841b02f4af5eac3e4975ed/lib/SP/Services/Api/ApiService.php#L175
           - Usage of ansible vars: https://github.com/ansible/ansible/issues/33738#issuecomment-350819222
+          - With several terms, account searches and password views are sent as batched JSON-RPC requests.
 
         syspass function list:
           SyspassClient:
@@ -66,6 +67,12 @@ DOCUMENTATION = """
               - UserGroupDelete
             Others:
               -Backup
+              -batch
+              -map
+              -invalidate
+              -cached_password
+              -cache_password
+              -forget_passwords
 """
 
 EXAMPLES = """
@@ -89,6 +96,9 @@ NOTE: Default values are handled
   local_action: debug msg="{{ lookup('syspass', 'Server 1 test account', login=test, category='MySQL', customer='Customer 1', 
     url='https://exemp.le', notes='Additionnal infos', private=True, privategroupe=True) }}"
 
+- name: Several accounts sharing the same fields, fetched with batched requests
+  local_action: debug msg="{{ lookup('syspass', 'Server 1 test account', 'Server 2 test account', login=test, category='MySQL', customer='Customer 1') }}"
+
 - name: Minimum declaration to delete password
   local_action: debug msg="{{ lookup('syspass', 'Server 1 test account', state=absent) }}"
 
@@ -97,11 +107,14 @@ NOTE: Default values are handled
 
 import json
 import requests
-import random
+from collections import OrderedDict
+from functools import partial
 import string
 import urllib3
-import re
 import sys
+import itertools
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from ansible.errors import AnsibleError, AnsibleAssertionError
 from ansible.module_utils._text import to_native, to_text
 from ansible.plugins.lookup import LookupBase
@@ -112,41 +125,266 @@ try:
 except ImportError:
     from ansible.utils.display import Display
     display = Display()
+
+try:
+    # faster JSON encoding and decoding when installed, stdlib json otherwise
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # incremental parsing of account searches when installed
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # python2 needs the futures backport for this
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+try:
+    # compiled validation of API responses when installed
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# expected response shape per kind of API method, see SyspassClient._rpc
+RESPONSE_SCHEMAS = {
+    "search": {"type": "object",
+               "required": ["result"],
+               "properties": {"result": {"type": "object",
+                                         "required": ["count"],
+                                         "properties": {"count": {"type": "integer"},
+                                                        "result": {"type": "array"}}}}},
+    "create": {"type": "object",
+               "required": ["result"],
+               "properties": {"result": {"type": "object",
+                                         "required": ["itemId"],
+                                         "properties": {"itemId": {"type": "integer"}}}}},
+    "delete": {"type": "object",
+               "required": ["result"],
+               "properties": {"result": {"type": "object",
+                                         "required": ["resultCode"],
+                                         "properties": {"resultCode": {"type": "integer"}}}}},
+}
+
+if fastjsonschema is not None:
+    RESPONSE_VALIDATORS = dict((kind, fastjsonschema.compile(schema))
+                               for kind, schema in RESPONSE_SCHEMAS.items())
+else:
+    RESPONSE_VALIDATORS = {}
+
+# disables https warnings in python2, certificates are not verified
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     
 class SyspassClient:
+    # fixed attribute layout, avoids a per instance __dict__
+    __slots__ = ('API_KEY', 'API_URL', 'API_ACC_TOKPWD',
+                 '_next_id',
+                 '_auth_blob', '_auth_blob_with_tok',
+                 '_cat_cache', '_cli_cache', '_tag_cache', '_ug_cache',
+                 '_pw_cache',
+                 '_batch_supported',
+                 'session')
+
+    # serialized '{"jsonrpc":"2.0","method":...,"params":' prefix per method
+    _envelopes = {}
+
     def __init__(self, API_KEY, API_URL, API_ACC_TOKPWD):
         self.API_KEY = API_KEY
         self.API_URL = API_URL
         self.API_ACC_TOKPWD = API_ACC_TOKPWD
-        self.rId = 1
+        self._auth_blob = {"authToken": API_KEY}
+        self._auth_blob_with_tok = {"authToken": API_KEY, "tokenPass": API_ACC_TOKPWD}
+        # JSON-RPC request ids, next() on a count is atomic so map()
+        # workers never share an id
+        self._next_id = partial(next, itertools.count(1))
+
+        # name -> search result caches, client, tag and user group names
+        # are matched case insensitively like syspass does.
+        self._cat_cache = {}
+        self._cli_cache = {}
+        self._tag_cache = {}
+        self._ug_cache = {}
+        # (name, login, category, customer) -> password, filled by the lookup
+        # plugin so a term repeated within one task is only fetched once
+        self._pw_cache = {}
+        # set to False once the server rejected a batch request
+        self._batch_supported = True
+
+        # One pooled session per client so that consecutive API calls reuse
+        # the same keep-alive TCP/TLS connection instead of a new handshake.
+        # Only connection errors are retried: every call is a POST, and
+        # replaying e.g. account/create after a 5xx could duplicate it.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections = 4,
+                              pool_maxsize = 8,
+                              max_retries = Retry(total = 3, backoff_factor = 0.2))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.verify = False
+        # syspass gzips its JSON answers when asked to, account lists shrink a lot
+        self.session.headers.update({'Content-Type': 'application/json',
+                                     'Accept-Encoding': 'gzip, deflate',
+                                     'Connection': 'keep-alive'})
+
+    def _post(self, data, stream = False):
+        """
+        Posts data to the API and returns the parsed response,
+        or the unread requests response when stream is set.
+        data is serialized and the response parsed with orjson when it is available,
+        data already serialized by _rpc is sent as is.
+        """
+        if orjson is None:
+            req = self.session.post(self.API_URL, data = json.dumps(data), stream = stream)
+            return req if stream else req.json()
+        if not isinstance(data, bytes):
+            data = orjson.dumps(data)
+        req = self.session.post(self.API_URL, data = data, stream = stream)
+        return req if stream else orjson.loads(req.content)
+
+    def _rpc(self, name, method, params, tokenPass = False, stream = False):
+        """
+        Sends a JSON-RPC call and returns the parsed response.
+        name is the public method name used in error messages.
+        params are completed with authToken, and tokenPass when asked.
+        Search, create and delete responses are checked against
+        RESPONSE_SCHEMAS when fastjsonschema is available.
+        """
+        params.update(self._auth_blob_with_tok if tokenPass else self._auth_blob)
+        if orjson is None:
+            data = {"jsonrpc": "2.0",
+                    "method": method,
+                    "params": params,
+                    "id": self._next_id()}
+        else:
+            envelope = self._envelopes.get(method)
+            if envelope is None:
+                envelope = b'{"jsonrpc":"2.0","method":' + orjson.dumps(method) + b',"params":'
+                self._envelopes[method] = envelope
+            data = envelope + orjson.dumps(params) + (',"id":%d}' % self._next_id()).encode()
+
+        req = self._post(data, stream = stream)
+        validator = RESPONSE_VALIDATORS.get(method.rsplit('/', 1)[-1])
+        if validator is not None and not stream and not self._valid(validator, req):
+            raise self._error(name, req)
+        return req
+
+    @staticmethod
+    def _stream_find_by_name(req, text):
+        """
+        Reads a streamed search response up to the record named text,
+        records before it are the only ones built.
+        Returns None if there is no such record.
+        """
+        # everything but the records, to check the response like _rpc does
+        head = ijson.ObjectBuilder()
+        def events():
+            for prefix, event, value in ijson.parse(req.raw, use_float = True):
+                if not prefix.startswith('result.result.item'):
+                    head.event(event, value)
+                yield prefix, event, value
+
+        req.raw.decode_content = True
+        try:
+            for res in ijson.items(events(), 'result.result.item'):
+                if res['name'] == text:
+                    return res
+        finally:
+            # read what is left so the keep-alive connection goes back to the pool
+            while req.raw.read(65536):
+                pass
+            req.raw.release_conn()
+
+        validator = RESPONSE_VALIDATORS.get('search')
+        if 'error' in head.value or (validator is not None and not SyspassClient._valid(validator, head.value)):
+            raise SyspassClient._error('AccountSearch', head.value)
+        return None
+
+    @staticmethod
+    def _valid(validator, req):
+        """
+        Returns whether req passes the compiled schema validator.
+        """
+        try:
+            validator(req)
+        except fastjsonschema.JsonSchemaException:
+            return False
+        return True
+
+    @staticmethod
+    def _error(name, req):
+        """
+        Returns the AnsibleError of a failed name call,
+        the response is truncated as it may hold a whole result set.
+        """
+        return AnsibleError('%s Error : %s' % (name, repr(req)[:512]))
+
+    @staticmethod
+    def _find_by_name(results, text, ignoreCase = False):
+        """
+        Returns the record of results named text, None if there is none.
+        The first record wins when several share the same name.
+        """
+        if ignoreCase:
+            text = text.upper()
+            return next((res for res in results if res['name'].upper() == text), None)
+        return next((res for res in results if res['name'] == text), None)
+
+    def cached_password(self, key):
+        """
+        Returns the password cached under key, None if there is none.
+        """
+        return self._pw_cache.get(key)
+
+    def cache_password(self, key, password):
+        """
+        Caches password under key, key being (name, login, category, customer).
+        """
+        self._pw_cache[key] = password
+
+    def forget_passwords(self, name):
+        """
+        Drops every cached password of the account name.
+        """
+        for key in [key for key in self._pw_cache if key[0] == name]:
+            del self._pw_cache[key]
+
+    def invalidate(self):
+        """
+        Empties category, client, tag and user group search caches.
+        """
+        self._cat_cache.clear()
+        self._cli_cache.clear()
+        self._tag_cache.clear()
+        self._ug_cache.clear()
 
-    def AccountSearch(self, text, count = None, categoryId = None, clientId = None, matchAll = None):
+    def AccountSearch(self, text, count = None, categoryId = None, clientId = None, matchAll = None,
+                      stream = False):
         """
         Search account in syspass using text as keyword,
         can apply categoryId of clientId as a filter.
-        """
-        data = {   "jsonrpc": "2.0",
-                   "method": "account/search",
-                   "params": {
-                       "authToken": self.API_KEY,
-		       "text": text,
-                       "count": count,
-                       "categoryId": categoryId,
-                       "clientId": clientId},
-                   "id": self.rId }
-
-        self.rId+=1
-        req = requests.post(self.API_URL, json = data)
-        req = req.json()
-        if req['result']['count'] > 0:
+        stream reads a single name search incrementally with ijson,
+        only worth it for very large result sets.
+        """
+        params = {"text": text,
+                  "count": count,
+                  "categoryId": categoryId,
+                  "clientId": clientId}
+        if stream and matchAll == None and ijson is not None:
+            req = self._rpc("AccountSearch", "account/search", params, stream = True)
+            return self._stream_find_by_name(req, text)
+
+        req = self._rpc("AccountSearch", "account/search", params)
+        if (req.get('result') or {}).get('count', 0) > 0:
             if matchAll == None:
-                for res in req['result']['result']:
-                    if res['name'] == text:
-                        return req['result']['result'][0]
+                return self._find_by_name(req['result']['result'], text)
             else:
                 return req['result']['result']
         elif 'error' in req:
-            raise AnsibleError('AccountSearch Error : %s' % (req))
+            raise self._error('AccountSearch', req)
         else:
             return None
 
@@ -156,23 +394,11 @@ class SyspassClient:
         uId identifies account.
         tokenPass is used to decrypt encrypted data.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "account/viewPass",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "id": uId,
-                    "tokenPass": self.API_ACC_TOKPWD
-                },
-                "id": self.rId 
-        }
-
-        self.rId+=1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['count'] > 0:
+        req = self._rpc("AccountViewpass", "account/viewPass", {"id": uId}, tokenPass = True)
+        if (req.get('result') or {}).get('count', 0) > 0:
             return req['result']['result']['password']
         else:
-            raise AnsibleError('AccountViewpass Error : %s' % (req))
+            raise self._error('AccountViewpass', req)
     
     def AccountCreate(self,
                       name,
@@ -191,77 +417,44 @@ class SyspassClient:
         """
         Creates account for syspass.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "account/create",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "tokenPass": self.API_ACC_TOKPWD,
-                    "name": name,
-                    "categoryId": categoryId,
-                    "clientId": clientId,
-                    "userGroupId": userGroupId,
-                    "pass": password,
-                    "login": login,
-                    "url": url,
-                    "tagsId": tags,
-                    "notes": notes,
-                    "private": private,
-                    "privateGroup": privateGroup,
-                    "expireDate": expireDate,
-                    "parentId": parentId
-		},
-		"id": self.rId
-        }
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['itemId'] > 0:
+        req = self._rpc("AccountCreate", "account/create", {"name": name,
+                                                            "categoryId": categoryId,
+                                                            "clientId": clientId,
+                                                            "userGroupId": userGroupId,
+                                                            "pass": password,
+                                                            "login": login,
+                                                            "url": url,
+                                                            "tagsId": tags,
+                                                            "notes": notes,
+                                                            "private": private,
+                                                            "privateGroup": privateGroup,
+                                                            "expireDate": expireDate,
+                                                            "parentId": parentId},
+                        tokenPass = True)
+        if (req.get('result') or {}).get('itemId', 0) > 0:
             return req['result']
         else:
-            raise AnsibleError('AccountCreate Error : %s' % (req))
+            raise self._error('AccountCreate', req)
 
     def AccountDelete(self, uId):
         """
         Delete syspass account.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "account/delete",
-		"params":{
-	            "authToken": self.API_KEY,
-                    "id": uId,
-                    "tokenPass": self.API_ACC_TOKPWD
-                },
-                "id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['resultCode'] == 0:
+        req = self._rpc("AccountDelete", "account/delete", {"id": uId}, tokenPass = True)
+        if (req.get('result') or {}).get('resultCode') == 0:
             return req['result']
         else:
-            raise AnsibleError('AccountDelete Error : %s' % (req))
+            raise self._error('AccountDelete', req)
 
     def AccountView(self, uId):
         """
         View syspass account.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "account/view",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "id": uId
-                },
-                "id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['count'] > 0:
+        req = self._rpc("AccountView", "account/view", {"id": uId})
+        if (req.get('result') or {}).get('count', 0) > 0:
             return req['result']['result']
         else:
-            raise AnsibleError('AccountView Error : %s' % (req))
+            raise self._error('AccountView', req)
         
     
     def CategorySearch(self,text, count = None):
@@ -270,26 +463,17 @@ class SyspassClient:
         text is the keyword.
         count is the number of results.
         """
+        if text in self._cat_cache:
+            return self._cat_cache[text]
 
-        data = {"jsonrpc": "2.0",
-                "method": "category/search",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "text": text,
-                    "count": count
-		},
-		"id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['count'] > 0:
-            for res in req['result']['result']:
-                if res['name'] == text:
-                    return req['result']['result'][0]
+        req = self._rpc("CategorySearch", "category/search", {"text": text, "count": count})
+        if (req.get('result') or {}).get('count', 0) > 0:
+            res = self._find_by_name(req['result']['result'], text)
+            if res is not None:
+                self._cat_cache[text] = res
+            return res
         elif 'error' in req:
-            raise AnsibleError('CategorySearch Error : %s' % (req['error']))        
+            raise self._error('CategorySearch', req)        
         else:
             return None
         
@@ -297,68 +481,38 @@ class SyspassClient:
         """
         Creates syspass category.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "category/create",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "name": name,
-                    "description": description
-		},
-                "id": self.rId
-	}
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['itemId'] > 0:
+        req = self._rpc("CategoryCreate", "category/create", {"name": name, "description": description})
+        if (req.get('result') or {}).get('itemId', 0) > 0:
             return req['result']
         else:
-            raise AnsibleError('CategoryCreate Error : %s' % (req))
+            raise self._error('CategoryCreate', req)
 
     def CategoryDelete(self, Id):
         """
         Deletes syspass category.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "category/delete",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "id": Id
-		},
-                "id": self.rId
-	}
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['resultCode'] == 0:
+        req = self._rpc("CategoryDelete", "category/delete", {"id": Id})
+        if (req.get('result') or {}).get('resultCode') == 0:
+            self.invalidate()
             return req['result']
         else:
-            raise AnsibleError('CategoryDelete Error : %s' % (req))
+            raise self._error('CategoryDelete', req)
         
     def ClientSearch(self, text, count = None):
         """
         Searches syspass client.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "client/search",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "text": text,
-                    "count": count
-		},
-		"id": self.rId
-        }
+        if text.upper() in self._cli_cache:
+            return self._cli_cache[text.upper()]
 
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['count'] > 0:
-            for res in req['result']['result']:
-                if res['name'].upper() == text.upper():
-                    return req['result']['result'][0]
+        req = self._rpc("ClientSearch", "client/search", {"text": text, "count": count})
+        if (req.get('result') or {}).get('count', 0) > 0:
+            res = self._find_by_name(req['result']['result'], text, ignoreCase = True)
+            if res is not None:
+                self._cli_cache[text.upper()] = res
+            return res
         elif 'error' in req:
-            raise AnsibleError('ClientSearch Error : %s' % (req['error']))
+            raise self._error('ClientSearch', req)
         else:
             return None
 
@@ -366,90 +520,50 @@ class SyspassClient:
         """
         Creates a syspass client.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "client/create",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "name": name,
-                    "description": description,
-                    "global": Global
-		},
-		"id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['itemId'] > 0:
+        req = self._rpc("ClientCreate", "client/create", {"name": name,
+                                                          "description": description,
+                                                          "global": Global})
+        if (req.get('result') or {}).get('itemId', 0) > 0:
             return req['result']
         else:
-            raise AnsibleError('ClientCreate Error : %s' % (req))
+            raise self._error('ClientCreate', req)
 
     def ClientDelete(self, cId):
         """
         Deletes a syspass client.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "client/delete",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "id": cId
-		},
-		"id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['resultCode'] == 0:
+        req = self._rpc("ClientDelete", "client/delete", {"id": cId})
+        if (req.get('result') or {}).get('resultCode') == 0:
+            self.invalidate()
             return req['result']
         else:
-            raise AnsibleError('ClientDelete Error : %s' % (req))
+            raise self._error('ClientDelete', req)
 
     def TagCreate(self,name):
         """
         Creates a syspass tag.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "tag/create",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "name": name
-                },
-                "id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['itemId'] > 0:
+        req = self._rpc("TagCreate", "tag/create", {"name": name})
+        if (req.get('result') or {}).get('itemId', 0) > 0:
             return req['result']
         else:
-            raise AnsibleError('TagCreate Error : %s' % (req))
+            raise self._error('TagCreate', req)
     
     def TagSearch(self, text, count = None):
         """
         Searches a syspass tag using text as keyword.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "tag/search",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "text": text,
-                    "count": count
-		},
-		"id": self.rId
-        }
+        if text.upper() in self._tag_cache:
+            return self._tag_cache[text.upper()]
 
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['count'] > 0:
-            for res in req['result']['result']:
-                if res['name'].upper() == text.upper():
-                    return req['result']['result'][0]
+        req = self._rpc("TagSearch", "tag/search", {"text": text, "count": count})
+        if (req.get('result') or {}).get('count', 0) > 0:
+            res = self._find_by_name(req['result']['result'], text, ignoreCase = True)
+            if res is not None:
+                self._tag_cache[text.upper()] = res
+            return res
         elif 'error' in req:
-            raise AnsibleError('TagSearch Error : %s' % (req['error']))
+            raise self._error('TagSearch', req)
         else:
             return None
         
@@ -457,68 +571,38 @@ class SyspassClient:
         """
         Deletes syspass tag using id.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "tag/delete",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "id" : tId
-                },
-                "id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['resultCode'] == 0:
+        req = self._rpc("TagDelete", "tag/delete", {"id": tId})
+        if (req.get('result') or {}).get('resultCode') == 0:
+            self.invalidate()
             return req['result']
         else:
-            raise AnsibleError('TagDelete Error : %s' % (req))
+            raise self._error('TagDelete', req)
 
     def UserGroupCreate(self,name,description):
         """
         Creates a syspass User Group.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "userGroup/create",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "name": name,
-                    "description": description
-                },
-                "id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['itemId'] > 0:
+        req = self._rpc("UserGroupCreate", "userGroup/create", {"name": name, "description": description})
+        if (req.get('result') or {}).get('itemId', 0) > 0:
             return req['result']
         else:
-            raise AnsibleError('UserGroupCreate Error : %s' % (req))
+            raise self._error('UserGroupCreate', req)
     
     def UserGroupSearch(self, text, count = None):
         """
         Searches a syspass User Group using text as keyword.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "userGroup/search",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "text": text,
-                    "count": count
-		},
-		"id": self.rId
-        }
+        if text.upper() in self._ug_cache:
+            return self._ug_cache[text.upper()]
 
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['count'] > 0:
-            for res in req['result']['result']:
-                if res['name'].upper() == text.upper():
-                    return req['result']['result'][0]
+        req = self._rpc("UserGroupSearch", "userGroup/search", {"text": text, "count": count})
+        if (req.get('result') or {}).get('count', 0) > 0:
+            res = self._find_by_name(req['result']['result'], text, ignoreCase = True)
+            if res is not None:
+                self._ug_cache[text.upper()] = res
+            return res
         elif 'error' in req:
-            raise AnsibleError('UserGroupSearch Error : %s' % (req['error']))
+            raise self._error('UserGroupSearch', req)
         else:
             return None
 
@@ -526,44 +610,69 @@ class SyspassClient:
         """
         Deletes syspass User Group using id.
         """
-        data = {"jsonrpc": "2.0",
-                "method": "userGroup/delete",
-                "params":{
-                    "authToken": self.API_KEY,
-                    "id" : ugId
-                },
-                "id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        req = req.json()
-        if req['result']['resultCode'] == 0:
+        req = self._rpc("UserGroupDelete", "userGroup/delete", {"id": ugId})
+        if (req.get('result') or {}).get('resultCode') == 0:
+            self.invalidate()
             return req['result']
         else:
-            raise AnsibleError('UserGroupDelete Error : %s' % (req))
+            raise self._error('UserGroupDelete', req)
     
     def Backup(self):
         """
         https://github.com/nuxsmin/sysPass/issues/1004#issuecomment-411487284
         """
-        data = {"jsonrpc": "2.0",
-                "method": "backup",
-                "params":{
-                    "authToken": self.API_KEY,
-                },
-                "id": self.rId
-        }
-
-        self.rId += 1
-        req = requests.post(self.API_URL, json = data, verify = False)
-        if 'result' in req.json():        
-            return req.json()['result']
+        req = self._rpc("Backup", "backup", {})
+        if 'result' in req:        
+            return req['result']
         else:
-            raise AnsibleError('Backup Error : %s' % (req.json()))
+            raise self._error('Backup', req)
+
+    def batch(self, calls):
+        """
+        Sends several API calls in a single JSON-RPC batch request.
+        calls is a list of (method, params) tuples, authToken is added to params.
+        Returns responses keyed by request id, in the order of calls.
+        Once the server rejected a batch, raises without sending anything.
+        """
+        if not self._batch_supported:
+            raise self._error('Batch', 'batch requests are not supported by this server')
+
+        data = []
+        for method, params in calls:
+            params = dict(params, **self._auth_blob)
+            data.append({"jsonrpc": "2.0",
+                         "method": method,
+                         "params": params,
+                         "id": self._next_id()})
+
+        req = self._post(data)
+        if not isinstance(req, list):
+            self._batch_supported = False
+            raise self._error('Batch', req)
+        results = dict((res.get('id'), res) for res in req)
+        return OrderedDict((call['id'], results.get(call['id'])) for call in data)
+
+    def map(self, method_name, arg_list, max_workers = 8):
+        """
+        Calls method_name once per keyword arguments dict of arg_list,
+        concurrently on a thread pool sharing the client session.
+        Useful when the server does not handle batch requests.
+        Returns results in the order of arg_list.
+        """
+        method = getattr(self, method_name)
+        if ThreadPoolExecutor is None or len(arg_list) < 2:
+            return [method(**kwargs) for kwargs in arg_list]
+
+        with ThreadPoolExecutor(max_workers = min(max_workers, len(arg_list))) as executor:
+            return list(executor.map(lambda kwargs: method(**kwargs), arg_list))
 
 class LookupModule(LookupBase):
-    
+    # SyspassClient per API credentials. Ansible forks a worker per task and
+    # host, so it is shared by the lookups of one task (loops) only.
+    _clients = {}
+    # bound once instead of resolved from module globals per password
+    _random_password = staticmethod(random_password)
+
     def _gen_candidate_chars(self, characters):
         '''Generate a string containing all valid chars as defined by ``characters``
         :arg characters: A list of character specs. The character specs are
@@ -641,7 +750,7 @@ class LookupModule(LookupBase):
 
 
     def _account_create(self, sp, params):
-        psswd = ''.join(random.choice(params['chars']) for _ in range(params['psswd_length']))
+        psswd = self._random_password(length = int(params['psswd_length']), chars = params['chars'])
 
         # Following handlers verify existence of fields
         # creating them in case of absence.
@@ -686,8 +795,29 @@ class LookupModule(LookupBase):
                          parentId = None)
         return psswd
 
+    def _client(self, params):
+        """
+        Returns the SyspassClient for the API of params, shared with its
+        connection and caches by the lookups of the current worker.
+        """
+        key = (params['syspass_API_URL'], params['syspass_API_KEY'], params['syspass_API_ACC_TOKPWD'])
+        if key not in self._clients:
+            self._clients[key] = SyspassClient(API_URL= params['syspass_API_URL'],
+                                               API_KEY = params['syspass_API_KEY'],
+                                               API_ACC_TOKPWD = params['syspass_API_ACC_TOKPWD'])
+        return self._clients[key]
+
+    def _password_key(self, params, name):
+        return (name, params['login'], params['category'], params['customer'])
+
     def _account_exist_or_create(self, sp, params):
         values = []        
+        key = self._password_key(params, params['account'])
+        if params['state'] == 'absent':
+            sp.forget_passwords(params['account'])
+        elif sp.cached_password(key) is not None:
+            return [sp.cached_password(key)]
+
         account = self._account_exist(sp, params['account'])
         if account is not None and isinstance(account, dict) and account['id']:
             if params['state'] == 'absent':
@@ -699,26 +829,104 @@ class LookupModule(LookupBase):
             psswd = 'Deleted Account'
         else:
             psswd = self._account_create(sp, params)
+        if params['state'] != 'absent':
+            sp.cache_password(key, psswd)
         values.append(psswd)            
         return values
+
+    def _accounts_exist(self, sp, searches):
+        """
+        Batched _account_exist, searches every name in one round trip.
+        """
+        calls = [('account/search', {'text': search, 'count': 1}) for search in searches]
+        try:
+            responses = sp.batch(calls).values()
+        except AnsibleError:
+            # older syspass servers reject batch requests
+            found = sp.map('AccountSearch', [{'text': search, 'count': 1} for search in searches])
+            return [account if isinstance(account, dict) and account['name'] == search else None
+                    for search, account in zip(searches, found)]
+        accounts = []
+        for search, res in zip(searches, responses):
+            if res is None or 'error' in res:
+                raise sp._error('AccountSearch', res)
+            account = None
+            if (res.get('result') or {}).get('count', 0) > 0:
+                account = sp._find_by_name(res['result']['result'], search)
+            accounts.append(account)
+        return accounts
+
+    def _accounts_viewpass(self, sp, accounts):
+        """
+        Batched AccountViewpass, reads every password in one round trip.
+        """
+        calls = [('account/viewPass', {'id': account['id'], 'tokenPass': sp.API_ACC_TOKPWD})
+                 for account in accounts]
+        try:
+            responses = sp.batch(calls).values()
+        except AnsibleError:
+            return sp.map('AccountViewpass', [{'uId': account['id']} for account in accounts])
+        passwords = []
+        for res in responses:
+            if res is None or 'error' in res or not (res.get('result') or {}).get('count', 0) > 0:
+                raise sp._error('AccountViewpass', res)
+            passwords.append(res['result']['result']['password'])
+        return passwords
+
+    def _accounts_exist_or_create(self, sp, params, terms):
+        if params['state'] == 'absent':
+            unique = []
+            for term in terms:
+                sp.forget_passwords(term)
+                if term not in unique:
+                    unique.append(term)
+            self._accounts_fetch_or_create(sp, params, unique)
+            return ['Deleted Account' for _ in terms]
+
+        missing = []
+        for term in terms:
+            if sp.cached_password(self._password_key(params, term)) is None and term not in missing:
+                missing.append(term)
+        if missing:
+            for term, psswd in zip(missing, self._accounts_fetch_or_create(sp, params, missing)):
+                sp.cache_password(self._password_key(params, term), psswd)
+        return [sp.cached_password(self._password_key(params, term)) for term in terms]
+
+    def _accounts_fetch_or_create(self, sp, params, terms):
+        accounts = self._accounts_exist(sp, terms)
+        found = [account for account in accounts if account is not None and account['id']]
+        if params['state'] == 'absent':
+            for account in found:
+                sp.AccountDelete(uId = account['id'])
+            return ['Deleted Account' for _ in terms]
+
+        passwords = {}
+        if found:
+            passwords = dict(zip([account['id'] for account in found],
+                                 self._accounts_viewpass(sp, found)))
+        values = []
+        for term, account in zip(terms, accounts):
+            if account is not None and account['id']:
+                values.append(passwords[account['id']])
+            else:
+                values.append(self._account_create(sp, dict(params, account = term)))
+        return values
     
     def run(self, term, variables=None, **kwargs):
-        # disables https warnings in python2
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
         if isinstance(term, dict):        
             term = dict(term[0])
         elif len(term) == 1:
             term = term[0]
-        else:
+        elif len(term) == 0:
             raise AnsibleError('Term is not correct Error : %s' % term)
 
         params = self._get_params(term, variables, kwargs)
         
-        sp = SyspassClient(API_URL= params['syspass_API_URL'],
-                           API_KEY = params['syspass_API_KEY'],
-                           API_ACC_TOKPWD = params['syspass_API_ACC_TOKPWD'])
-        values = self._account_exist_or_create(sp, params)
+        sp = self._client(params)
+        if isinstance(term, list):
+            values = self._accounts_exist_or_create(sp, params, term)
+        else:
+            values = self._account_exist_or_create(sp, params)
         return values
 
 def main(argv=sys.argv[1:]):